@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Optional build of the compiled cipdb._core_fast extension.
+
+All metadata lives in pyproject.toml. The extension is only built when
+Cython is importable at build time (e.g. `pip install cython setuptools
+wheel` followed by `pip install --no-build-isolation .`); otherwise cipdb installs as pure
+Python and uses the generated check() in _core.
+"""
+
+from setuptools import setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    from setuptools import Extension
+
+    ext_modules = cythonize(
+        [
+            Extension(
+                "cipdb._core_fast",
+                ["src/cipdb/_core_fast.pyx"],
+                optional=True,
+            )
+        ],
+        language_level=3,
+    )
+
+setup(ext_modules=ext_modules)
@@ -8,8 +8,26 @@ Debug specific breakpoints by ID matching.
 
 import os
 import sys
-from typing import Union, Optional, Callable
 
-from ._core import set_trace, post_mortem, disable, enable
+from ._core import (
+    set_trace,
+    post_mortem,
+    disable,
+    enable,
+    refresh_env,
+    install_ast_optimizer,
+)
+from ._core import _TRUTHY
 
-__all__ = ["set_trace", "post_mortem", "disable", "enable"]
+__all__ = [
+    "set_trace",
+    "post_mortem",
+    "disable",
+    "enable",
+    "refresh_env",
+    "install_ast_optimizer",
+]
+
+# Opt-in import-time elision of cipdb.set_trace(False) calls
+if os.environ.get("CIPDB_OPTIMIZE", "").lower() in _TRUTHY:
+    install_ast_optimizer()
@@ -19,12 +19,68 @@ Examples:
     python -m cipdb --status
 """
 
-import argparse
+from __future__ import annotations
+
 import os
 import sys
-from typing import List, Optional
 
-from ._core import enable, disable
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import List, Optional
+
+from ._core import _checker, enable, disable
+
+_EPILOG = """
+Examples:
+  python -m cipdb script.py                      # Run with all breakpoints enabled
+  python -m cipdb --id validate script.py       # Run with specific breakpoint ID
+  python -m cipdb --ids validate,save script.py # Run with multiple breakpoint IDs
+  python -m cipdb --env DEBUG=true script.py    # Set environment variable
+  python -m cipdb --disable script.py           # Run with debugging disabled
+  python -m cipdb --status                       # Show current status
+        """
+
+# Pre-rendered `--help` output per program name, printed without building
+# the parser; only the usage line depends on how cipdb was invoked
+_HELP_BODY = """
+Run Python scripts with cipdb conditional debugging
+
+positional arguments:
+  script                Python script to run
+  args                  Arguments to pass to the script
+
+options:
+  -h, --help            show this help message and exit
+  --id CIPDB_ID         Set CIPDB_ID to run specific breakpoint
+  --ids CIPDB_IDS       Set CIPDB_IDS to run multiple breakpoints (comma-
+                        separated)
+  --env ENV_VARS, --environment ENV_VARS
+                        Set environment variable (KEY=value or KEY for truthy)
+  --disable             Globally disable all cipdb breakpoints
+  --enable              Globally enable cipdb breakpoints (default)
+  --status              Show cipdb status and environment variables
+""" + _EPILOG
+
+_HELP = {
+    "python -m cipdb": """\
+usage: python -m cipdb [-h] [--id CIPDB_ID] [--ids CIPDB_IDS] [--env ENV_VARS]
+                       [--disable] [--enable] [--status]
+                       [script] [args ...]
+""" + _HELP_BODY,
+    "cipdb": """\
+usage: cipdb [-h] [--id CIPDB_ID] [--ids CIPDB_IDS] [--env ENV_VARS]
+             [--disable] [--enable] [--status]
+             [script] [args ...]
+""" + _HELP_BODY,
+}
+
+# argparse lays help out differently across versions ("optional arguments:"
+# before 3.10, "--env, --environment ENV_VARS" from 3.13), so the copy above
+# are only used where they match _build_parser() (checked in the tests)
+_HELP_IS_CURRENT = (3, 10) <= sys.version_info[:2] <= (3, 12)
+
+# Fixed help width so the output does not depend on the terminal size
+_HELP_WIDTH = 78
 
 
 def setup_environment(env_vars: Optional[List[str]] = None, cipdb_id: Optional[str] = None, cipdb_ids: Optional[str] = None) -> None:
@@ -43,6 +99,8 @@ def setup_environment(env_vars: Optional[List[str]] = None, cipdb_id: Optional[s
     if cipdb_ids:
         os.environ['CIPDB_IDS'] = cipdb_ids
 
+    _checker.invalidate_env()
+
 
 def show_status() -> None:
     """Show current cipdb configuration and environment."""
@@ -50,7 +108,6 @@ def show_status() -> None:
     print("=" * 40)
     
     # Check global state
-    from ._core import _checker
     print(f"Global enabled: {_checker.enabled}")
     
     # Show relevant environment variables
@@ -69,20 +126,25 @@ def show_status() -> None:
     print("  CIPDB_ID=batch-2 python -m cipdb script.py")
 
 
-def main() -> None:
-    """Main entry point for cipdb CLI."""
+def _prog() -> str:
+    """Return the program name matching how cipdb was invoked."""
+    name = os.path.basename(sys.argv[0]) if sys.argv else ""
+    if name == "__main__.py":
+        return "python -m cipdb"
+    return name or "cipdb"
+
+
+def _build_parser(prog: Optional[str] = None):
+    """Build the full argument parser (imports argparse lazily)."""
+    import argparse
+
     parser = argparse.ArgumentParser(
+        prog=prog or _prog(),
         description="Run Python scripts with cipdb conditional debugging",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  python -m cipdb script.py                      # Run with all breakpoints enabled
-  python -m cipdb --id validate script.py       # Run with specific breakpoint ID
-  python -m cipdb --ids validate,save script.py # Run with multiple breakpoint IDs
-  python -m cipdb --env DEBUG=true script.py    # Set environment variable
-  python -m cipdb --disable script.py           # Run with debugging disabled
-  python -m cipdb --status                       # Show current status
-        """
+        formatter_class=lambda prog: argparse.RawDescriptionHelpFormatter(
+            prog, width=_HELP_WIDTH
+        ),
+        epilog=_EPILOG,
     )
     
     parser.add_argument(
@@ -133,7 +195,29 @@ Examples:
         nargs='*',
         help='Arguments to pass to the script'
     )
-    
+
+    return parser
+
+
+def main() -> None:
+    """Main entry point for cipdb CLI."""
+    # Fast paths that do not need argparse at all. Only a lone --status is
+    # short-circuited: with --env/--id/--ids the environment must be set up
+    # first, which needs the full parser.
+    argv = sys.argv[1:]
+    if not argv or argv in (['-h'], ['--help']):
+        prog = _prog()
+        if _HELP_IS_CURRENT and prog in _HELP:
+            print(_HELP[prog])
+        else:
+            _build_parser(prog).print_help()
+        return
+    if argv == ['--status']:
+        show_status()
+        return
+
+    parser = _build_parser()
+
     # Parse known args to allow passing unknown args to the script
     args, unknown_args = parser.parse_known_args()
     
@@ -161,30 +245,16 @@ Examples:
     # Update sys.argv to match what the script expects
     sys.argv = script_args
     
-    # Run the script
-    try:
-        # Read and execute the script
-        with open(args.script, 'rb') as f:
-            script_code = compile(f.read(), args.script, 'exec')
-        
-        # Set up globals for the script
-        script_globals = {
-            '__file__': args.script,
-            '__name__': '__main__',
-            '__doc__': None,
-            '__package__': None,
-        }
-        
-        # Execute the script
-        exec(script_code, script_globals)
-        
-    except FileNotFoundError:
+    # Missing scripts are reported up front so that a FileNotFoundError
+    # raised by the script itself propagates naturally
+    if not os.path.exists(args.script):
         print(f"Error: Script '{args.script}' not found", file=sys.stderr)
         sys.exit(1)
-    except Exception as e:
-        # Let the exception propagate naturally
-        raise
 
+    # Run the script as __main__ (runpy sets __file__, __spec__, etc.)
+    import runpy
+
+    runpy.run_path(args.script, run_name='__main__')
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -17,94 +17,292 @@ A simple conditional debugging wrapper for iPDB.
 Debug specific breakpoints by ID matching.
 """
 
+import functools
 import sys
-from typing import Callable, Optional, Union
+from _thread import allocate_lock
+
+# typing is only needed for annotations (lazy via __future__); skip the import
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Callable, Optional, Union
+
+# Optional compiled check() (built with Cython, see setup.py)
+try:
+    from ._core_fast import make_check as _make_fast_check
+except ImportError:
+    _make_fast_check = None
+
+_MISSING = object()
+_FALSY = frozenset(("false", "0", "off"))
+_TRUTHY = frozenset(("true", "1", "yes", "on"))
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_str_condition(condition: str) -> Callable[[_ConditionChecker], bool]:
+    """Compile a string condition into a predicate over a checker."""
+    if "=" in condition:
+        # "VAR=value": exact match against the environment
+        var, val = condition.split("=", 1)
+        return lambda checker: checker._get_env(var) == val
+
+    # "VAR": env var exists and is truthy
+    def _is_truthy(checker: _ConditionChecker) -> bool:
+        env_val = checker._get_env(condition) or ""
+        # Common lowercase spellings skip the .lower() allocation
+        return env_val in _TRUTHY or env_val.lower() in _TRUTHY
+
+    return _is_truthy
+
+
+# Source templates for the specialized check() built by _ConditionChecker.
+# Branches that the current configuration makes dead are left out.
+_CHECK_DISABLED_SRC = """\
+def check(condition=True, id=None):
+    return False
+"""
+
+_CHECK_SRC = """\
+def check(condition=True, id=None):
+    # Literal False never triggers; True/False are singletons
+    if condition is False:
+        return False
+{id_block}
+    if condition is True:
+        return True
+    handler = dispatch_get(type(condition))
+    if handler is not None:
+        return handler(checker, condition)
+    return eval_other(condition)
+"""
+
+# CIPDB_ID/CIPDB_IDS set (production mode): the ID must be listed
+_ID_BLOCK_SRC = """\
+    if id and id not in active:
+        return False
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_check_src(src: str):
+    """Compile each check() variant once; rebuilds only re-run exec."""
+    return compile(src, "<cipdb-check>", "exec")
 
 
 class _ConditionChecker:
     """Internal condition evaluation logic."""
 
+    __slots__ = (
+        "_enabled",
+        "_env_cache",
+        "_active_ids",
+        "_generation",
+        "_lock",
+        "check",
+    )
+
     def __init__(self):
-        self.enabled = True  # Global enable/disable switch
+        self._enabled = True  # Global enable/disable switch
+        self._env_cache: dict[str, Optional[str]] = {}
+        self._active_ids: Optional[frozenset[str]] = _MISSING
+        # Bumped by invalidate_env(). Values computed from the environment
+        # are only stored if no invalidation happened meanwhile, so a
+        # concurrent os.environ write can never leave a stale entry behind.
+        self._generation = 0
+        self._lock = allocate_lock()
+        self.check = self._rebuild_check
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool) -> None:
+        self._enabled = value
+        self.invalidate_env()
+
+    def _get_env(self, name: str) -> Optional[str]:
+        """Return os.environ.get(name) through the per-checker cache."""
+        value = self._env_cache.get(name, _MISSING)
+        if value is _MISSING:
+            generation = self._generation
+            # Index directly: os.environ.get is a Python-level Mapping.get
+            # wrapping the same lookup, and `in` + [] would look up twice
+            try:
+                value = os.environ[name]
+            except KeyError:
+                value = None
+            with self._lock:
+                if generation == self._generation:
+                    self._env_cache[name] = value
+        return value
+
+    def _read_cipdb_disabled(self) -> bool:
+        """Whether the CIPDB environment override disables all breakpoints."""
+        cipdb_env = self._get_env("CIPDB") or ""
+        return cipdb_env in _FALSY or cipdb_env.lower() in _FALSY
+
+    def _get_active_ids(self) -> Optional[frozenset[str]]:
+        """
+        Return CIPDB_ID and CIPDB_IDS merged into one set of active IDs.
 
-    def check(
-        self,
-        condition: Union[bool, str, Callable] = True,
-        id: Optional[str] = None,
-    ) -> bool:
+        None means neither is set (development mode: every ID matches).
         """
-        Evaluate condition with ID matching support.
+        active = self._active_ids
+        if active is _MISSING:
+            generation = self._generation
+            cipdb_id = self._get_env("CIPDB_ID") or ""
+            cipdb_ids = self._get_env("CIPDB_IDS") or ""
+            if cipdb_id or cipdb_ids:
+                ids = {i.strip() for i in cipdb_ids.split(",")} if cipdb_ids else set()
+                if cipdb_id:
+                    ids.add(cipdb_id)
+                active = frozenset(ids)
+            else:
+                active = None
+            with self._lock:
+                if generation == self._generation:
+                    self._active_ids = active
+        return active
+
+    def invalidate_env(self) -> None:
+        """Drop cached environment values (call after mutating os.environ)."""
+        with self._lock:
+            self._generation += 1
+            self._env_cache = {}
+            self._active_ids = _MISSING
+            self.check = self._rebuild_check
+
+    def _build_check(self) -> Callable[..., bool]:
+        """
+        Generate check(condition=True, id=None) for the current configuration.
 
         Priority order (ALL must pass to trigger debugging):
         1. Global enable/disable switch (cipdb.enable/disable)
-        2. CIPDB environment override (CIPDB=false disables all)  
+        2. CIPDB environment override (CIPDB=false disables all)
         3. ID matching (if id provided):
            - Production mode: If CIPDB_ID or CIPDB_IDS is set → must match
            - Development mode: If neither is set → all ID breakpoints work
         4. Condition evaluation (boolean/callable/string must be truthy)
 
         Logic: Global AND Environment AND ID AND Condition = Debug
-        """
-        # Global switch
-        if not self.enabled:
-            return False
-
-        # Check environment override
-        cipdb_env = os.environ.get("CIPDB", "").lower()
-        if cipdb_env in ("false", "0", "off"):
-            return False
-
-        # ID-based matching
-        if id:
-            cipdb_id = os.environ.get("CIPDB_ID", "")
-            cipdb_ids = os.environ.get("CIPDB_IDS", "")
-            
-            # If ANY ID env var is set, must match (production mode)
-            if cipdb_id or cipdb_ids:
-                id_matches = False
-                
-                # Check CIPDB_ID (single ID)
-                if cipdb_id and cipdb_id == id:
-                    id_matches = True
-                
-                # Check CIPDB_IDS (comma-separated IDs)
-                elif cipdb_ids:
-                    ids_list = [i.strip() for i in cipdb_ids.split(",")]
-                    if id in ids_list:
-                        id_matches = True
-                
-                if not id_matches:
-                    return False
-            # If no ID env vars set, all ID breakpoints work (development mode)
-
-        # Evaluate condition
-        if isinstance(condition, bool):
-            return condition
-
-        elif isinstance(condition, str):
-            # String conditions check environment variables
-            if "=" in condition:
-                var, val = condition.split("=", 1)
-                return os.environ.get(var) == val
-            else:
-                # Check if env var exists and is truthy
-                env_val = os.environ.get(condition, "").lower()
-                return env_val in ("true", "1", "yes", "on")
 
-        elif callable(condition):
+        Steps 1-3 only depend on state that changes through enable/disable
+        or os.environ, so they are resolved here and compiled out of the
+        generated function; the result is rebuilt after every change. When
+        the optional cipdb._core_fast extension is built, its compiled
+        closure is used instead of generated source.
+        """
+        disabled = not self._enabled or self._read_cipdb_disabled()
+        active = None if disabled else self._get_active_ids()
+        if _make_fast_check is not None:
+            return _make_fast_check(
+                disabled, active, self._DISPATCH, self, self._eval_other
+            )
+
+        if disabled:
+            src = _CHECK_DISABLED_SRC
+        else:
+            id_block = _ID_BLOCK_SRC if active is not None else ""
+            src = _CHECK_SRC.format(id_block=id_block)
+
+        namespace = {
+            "checker": self,
+            "active": active,
+            "dispatch_get": self._DISPATCH.get,
+            "eval_other": self._eval_other,
+        }
+        exec(_compile_check_src(src), namespace)
+        return namespace["check"]
+
+    def _rebuild_check(
+        self,
+        condition: Union[bool, str, Callable] = True,
+        id: Optional[str] = None,
+    ) -> bool:
+        """Build the specialized check, install it, and evaluate once."""
+        generation = self._generation
+        check = self._build_check()
+        with self._lock:
+            if generation == self._generation:
+                self.check = check
+        return check(condition, id)
+
+    def _eval_str(self, condition: str) -> bool:
+        # String conditions check environment variables
+        return _compile_str_condition(condition)(self)
+
+    def _eval_other(self, condition) -> bool:
+        if callable(condition):
             try:
                 return bool(condition())
-            except:
+            except Exception:
                 return False
 
+        # str subclasses are rare enough to miss the dispatch table
+        if isinstance(condition, str):
+            return self._eval_str(condition)
+
         # Default to True for unknown types
         return True
 
+    # bool needs no entry: True/False are handled by identity in check()
+    _DISPATCH = {str: _eval_str}
+
 
 # Global condition checker instance
 _checker = _ConditionChecker()
 
 
+# Subclass os._Environ itself rather than type(os.environ), so that
+# reloading this module replaces the tracking class instead of stacking
+class _TrackedEnviron(os._Environ):
+    """os.environ that invalidates the checker's cache on every mutation."""
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        _checker.invalidate_env()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        _checker.invalidate_env()
+
+
+def _track_environ(environ) -> None:
+    """Swap environ's class in place so existing references are tracked too."""
+    if type(environ) is not _TrackedEnviron:
+        environ.__class__ = _TrackedEnviron
+
+
+# Process-wide: every os.environ / os.environb write invalidates the cache
+# (documented in the README). Both share the same underlying data.
+_track_environ(os.environ)
+if os.supports_bytes_environ:
+    _track_environ(os.environb)
+
+
+# Debugger module (ipdb, or pdb as fallback), resolved on first trigger.
+# The module rather than its functions is cached so patching
+# ipdb.set_trace/post_mortem keeps working.
+_debugger = None
+_debugger_takes_frame = False
+
+
+def _resolve_debugger():
+    """Return the debugger module, importing it on first use."""
+    global _debugger, _debugger_takes_frame
+    if _debugger is None:
+        try:
+            import ipdb as debugger
+        except ImportError:
+            import pdb as debugger
+
+        # ipdb.set_trace(frame) vs pdb.set_trace(*, header=None). Decided by
+        # module, not by signature: set_trace may be patched at first use.
+        _debugger_takes_frame = debugger.__name__ == "ipdb"
+        _debugger = debugger
+    return _debugger
+
+
 def set_trace(
     condition: Union[bool, str, Callable] = True,
     id: Optional[str] = None,
@@ -150,15 +348,27 @@ def set_trace(
     if not _checker.check(condition, id):
         return
 
-    # Import and call debugger
-    try:
-        import ipdb
+    # Call debugger. The caller's frame must be passed explicitly: left to
+    # itself, ipdb would stop one level too shallow, inside this function.
+    debugger = _debugger or _resolve_debugger()
+    if _debugger_takes_frame:
+        debugger.set_trace(sys._getframe(1))
+    else:
+        debugger.set_trace()
+
+
+if sys.version_info >= (3, 11):
+
+    def _get_current_tb():
+        """Traceback of the exception being handled, without a 3-tuple."""
+        exc = sys.exception()
+        return exc.__traceback__ if exc is not None else None
 
-        ipdb.set_trace(sys._getframe().f_back)
-    except ImportError:
-        import pdb
+else:
 
-        pdb.set_trace()
+    def _get_current_tb():
+        """Traceback of the exception being handled."""
+        return sys.exc_info()[2]
 
 
 def post_mortem(
@@ -178,17 +388,10 @@ def post_mortem(
         return
 
     if tb is None:
-        tb = sys.exc_info()[2]
+        tb = _get_current_tb()
 
     if tb:
-        try:
-            import ipdb
-
-            ipdb.post_mortem(tb)
-        except ImportError:
-            import pdb
-
-            pdb.post_mortem(tb)
+        (_debugger or _resolve_debugger()).post_mortem(tb)
 
 
 def disable() -> None:
@@ -200,4 +403,27 @@ def enable() -> None:
     """Globally enable cipdb debugging."""
     _checker.enabled = True
 
+
+def refresh_env() -> None:
+    """
+    Re-read environment variables on the next breakpoint.
+
+    Only needed after changes that bypass os.environ / os.environb,
+    such as os.putenv or C extensions calling setenv().
+    """
+    _checker.invalidate_env()
+
+
+def install_ast_optimizer() -> None:
+    """
+    Elide disabled breakpoints from modules imported after this call.
+
+    Statement-level `cipdb.set_trace(False)` / `cipdb.set_trace(condition=False)`
+    calls (with otherwise constant arguments) are removed from the module
+    AST before compilation. Also enabled by setting CIPDB_OPTIMIZE=1.
+    """
+    from ._optimizer import install
+
+    install()
+
 # EOF
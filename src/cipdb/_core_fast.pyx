@@ -0,0 +1,47 @@
+# cython: language_level=3
+# -*- coding: utf-8 -*-
+# Timestamp: "2026-10-14 11:02:17 (ywatanabe)"
+# File: /home/ywatanabe/proj/cipdb/src/cipdb/_core_fast.pyx
+# ----------------------------------------
+"""
+Optional compiled check() for cipdb.
+
+Built only when Cython is available (see setup.py); _core falls back to
+the generated pure-Python check() otherwise. Semantics must stay
+identical to _CHECK_SRC / _ID_BLOCK_SRC in _core.py.
+"""
+
+
+def _check_disabled(condition=True, id=None):
+    return False
+
+
+def make_check(bint disabled, active, dict dispatch, checker, eval_other):
+    """
+    Return check(condition=True, id=None) with configuration bound at build time.
+
+    A closure rather than a cdef class __call__: Cython functions support
+    vectorcall, while tp_call would re-parse an args tuple on every hit.
+    """
+    if disabled:
+        return _check_disabled
+
+    def check(condition=True, id=None):
+        # Literal False never triggers; True/False are singletons
+        if condition is False:
+            return False
+
+        # active is None in development mode (every ID matches)
+        if active is not None and id and id not in active:
+            return False
+
+        if condition is True:
+            return True
+        handler = dispatch.get(type(condition))
+        if handler is not None:
+            return handler(checker, condition)
+        return eval_other(condition)
+
+    return check
+
+# EOF
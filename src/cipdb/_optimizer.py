@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Timestamp: "2026-10-14 10:12:40 (ywatanabe)"
+# File: /home/ywatanabe/proj/cipdb/src/cipdb/_optimizer.py
+# ----------------------------------------
+from __future__ import annotations
+import os
+__FILE__ = (
+    "./cipdb/src/cipdb/_optimizer.py"
+)
+__DIR__ = os.path.dirname(__FILE__)
+# ----------------------------------------
+"""
+Import-time elision of disabled breakpoints.
+
+Modules imported after install() have statement-level
+`cipdb.set_trace(False)` / `cipdb.set_trace(condition=False)` calls
+removed from their AST before compilation, so breakpoints that can
+never trigger cost nothing in hot loops.
+"""
+
+import ast
+import sys
+from importlib.machinery import PathFinder, SourceFileLoader
+
+# Statement-list fields that must not be left empty after elision
+_BLOCK_FIELDS = ("body", "orelse", "finalbody")
+
+# Literal nodes: Python 3.7 parses literals into the pre-3.8 node types
+if sys.version_info >= (3, 8):
+    _CONSTANT_TYPES = (ast.Constant,)
+else:
+    _CONSTANT_TYPES = (
+        ast.Constant,
+        ast.NameConstant,
+        ast.Num,
+        ast.Str,
+        ast.Bytes,
+        ast.Ellipsis,
+    )
+
+
+def _is_false(node: ast.AST) -> bool:
+    return isinstance(node, _CONSTANT_TYPES) and getattr(node, "value", None) is False
+
+
+def _is_disabled_set_trace(call: ast.Call) -> bool:
+    """Match cipdb.set_trace(False, ...) with only constant arguments."""
+    func = call.func
+    if not (
+        isinstance(func, ast.Attribute)
+        and func.attr == "set_trace"
+        and isinstance(func.value, ast.Name)
+        and func.value.id == "cipdb"
+    ):
+        return False
+
+    # Any non-constant argument could have side effects; keep the call
+    values = list(call.args) + [kw.value for kw in call.keywords]
+    if not all(isinstance(v, _CONSTANT_TYPES) for v in values):
+        return False
+
+    if call.args:
+        return _is_false(call.args[0])
+    for kw in call.keywords:
+        if kw.arg == "condition":
+            return _is_false(kw.value)
+    return False
+
+
+class _SetTraceFalseEliminator(ast.NodeTransformer):
+    """Remove `cipdb.set_trace(False)` expression statements."""
+
+    def __init__(self):
+        self.removed = 0
+
+    def visit_Expr(self, node: ast.Expr):
+        if isinstance(node.value, ast.Call) and _is_disabled_set_trace(node.value):
+            self.removed += 1
+            return None
+        return self.generic_visit(node)
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        # First statement of each non-empty block, remembered for its
+        # location (Module and match_case carry none of their own). Only
+        # lists are blocks: Lambda.body and IfExp.body/orelse are expressions.
+        first = {}
+        for field in _BLOCK_FIELDS:
+            value = getattr(node, field, None)
+            if isinstance(value, list) and value:
+                first[field] = value[0]
+        super().generic_visit(node)
+        for field, stmt in first.items():
+            if not getattr(node, field):
+                setattr(node, field, [ast.copy_location(ast.Pass(), stmt)])
+        return node
+
+
+class _OptimizingLoader(SourceFileLoader):
+    """SourceFileLoader that compiles modules with disabled breakpoints elided."""
+
+    def get_code(self, fullname):
+        path = self.get_filename(fullname)
+        source = self.get_data(path)
+        if b"cipdb" not in source:
+            return super().get_code(fullname)
+
+        tree = ast.parse(source, path)
+        eliminator = _SetTraceFalseEliminator()
+        tree = eliminator.visit(tree)
+        if not eliminator.removed:
+            return super().get_code(fullname)
+
+        # Rewritten code bypasses __pycache__ so plain imports stay unaffected
+        return compile(tree, path, "exec", dont_inherit=True)
+
+
+class _OptimizingFinder:
+    """Meta path finder handing source modules to _OptimizingLoader."""
+
+    @classmethod
+    def find_spec(cls, fullname, path=None, target=None):
+        spec = PathFinder.find_spec(fullname, path, target)
+        if spec is not None and type(spec.loader) is SourceFileLoader:
+            spec.loader = _OptimizingLoader(spec.loader.name, spec.loader.path)
+        return spec
+
+
+def install() -> None:
+    """Register the optimizing finder ahead of the default path finder."""
+    if _OptimizingFinder in sys.meta_path:
+        return
+    try:
+        index = sys.meta_path.index(PathFinder)
+    except ValueError:
+        index = len(sys.meta_path)
+    sys.meta_path.insert(index, _OptimizingFinder)
+
+# EOF
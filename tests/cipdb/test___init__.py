@@ -33,6 +33,19 @@ class TestCipdbCore:
         cipdb.set_trace(False)
         assert not mock_ipdb.called
 
+    @patch('ipdb.set_trace')
+    def test_stops_in_caller_frame(self, mock_ipdb):
+        '''Test the debugger is handed the caller's frame.'''
+        cipdb.set_trace(True)
+        assert mock_ipdb.call_args[0][0] is sys._getframe()
+
+    def test_frame_passing_survives_patched_first_use(self, monkeypatch):
+        '''Test a patched set_trace at first trigger does not drop the frame.'''
+        monkeypatch.setattr(cipdb._core, '_debugger', None)
+        with patch('ipdb.set_trace', lambda: None):
+            cipdb._core._resolve_debugger()
+        assert cipdb._core._debugger_takes_frame
+
     @patch('ipdb.set_trace')
     def test_cipdb_id_matching(self, mock_ipdb):
         '''Test CIPDB_ID single ID matching.'''
@@ -77,6 +90,23 @@ class TestCipdbCore:
         cipdb.set_trace(id='save')
         assert mock_ipdb.called
 
+    @patch('ipdb.set_trace')
+    def test_cipdb_id_and_ids_combined(self, mock_ipdb):
+        '''Test CIPDB_ID and CIPDB_IDS are matched together.'''
+        os.environ['CIPDB_ID'] = 'single'
+        os.environ['CIPDB_IDS'] = 'validate,save'
+
+        cipdb.set_trace(id='single')
+        assert mock_ipdb.called
+
+        mock_ipdb.reset_mock()
+        cipdb.set_trace(id='save')
+        assert mock_ipdb.called
+
+        mock_ipdb.reset_mock()
+        cipdb.set_trace(id='other-point')
+        assert not mock_ipdb.called
+
     @patch('ipdb.set_trace')
     def test_no_id_always_triggers(self, mock_ipdb):
         '''Test that breakpoints without IDs always trigger.'''
@@ -131,6 +161,18 @@ class TestCipdbCore:
         cipdb.set_trace(lambda: x > 10)
         assert mock_ipdb.called
 
+    @patch('ipdb.set_trace')
+    def test_callable_condition_raises(self, mock_ipdb):
+        '''Test failing callables skip the breakpoint but not interrupts.'''
+        cipdb.set_trace(lambda: 1 / 0)
+        assert not mock_ipdb.called
+
+        def interrupt():
+            raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            cipdb.set_trace(interrupt)
+
     @patch('ipdb.set_trace')
     def test_global_disable(self, mock_ipdb):
         '''Test global disable/enable.'''
@@ -161,6 +203,21 @@ class TestCipdbCore:
         cipdb.set_trace(True)
         assert mock_ipdb.called
 
+    @patch('ipdb.set_trace')
+    def test_env_cache_invalidated_on_change(self, mock_ipdb):
+        '''Test cached env values follow os.environ mutations.'''
+        cipdb.set_trace("DEBUG")
+        assert not mock_ipdb.called
+
+        os.environ['DEBUG'] = 'true'
+        cipdb.set_trace("DEBUG")
+        assert mock_ipdb.called
+
+        mock_ipdb.reset_mock()
+        del os.environ['DEBUG']
+        cipdb.set_trace("DEBUG")
+        assert not mock_ipdb.called
+
     @patch('ipdb.post_mortem')
     def test_post_mortem(self, mock_pm):
         '''Test post_mortem functionality.'''
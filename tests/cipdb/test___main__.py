@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+'''Test suite for cipdb command-line interface.'''
+
+import sys
+import pytest
+from unittest.mock import patch
+from cipdb import __main__ as cli
+
+
+def _run(monkeypatch, *args):
+    '''Run cipdb's main() with the given command-line arguments.'''
+    monkeypatch.setattr(sys, 'argv', ['cipdb', *args])
+    cli.main()
+
+
+def _unset(monkeypatch, name):
+    '''Unset name for the test so that teardown removes values the CLI sets.'''
+    # delenv() alone records nothing for an absent variable
+    monkeypatch.setenv(name, '')
+    monkeypatch.delenv(name, raising=False)
+
+
+class TestHelp:
+    '''Test the pre-rendered help fast path.'''
+
+    @pytest.mark.skipif(not cli._HELP_IS_CURRENT, reason='argparse layout differs')
+    @pytest.mark.parametrize('columns', ['40', '80', '200'])
+    @pytest.mark.parametrize('prog', ['python -m cipdb', 'cipdb'])
+    def test_help_matches_parser(self, monkeypatch, columns, prog):
+        '''Test each _HELP entry is exactly what argparse renders.'''
+        monkeypatch.setenv('COLUMNS', columns)
+        assert cli._build_parser(prog).format_help() == cli._HELP[prog] + '\n'
+
+    @pytest.mark.parametrize('args', [(), ('-h',), ('--help',)])
+    def test_fast_help_matches_parser_help(self, monkeypatch, capsys, args):
+        '''Test fast-path help equals help printed via argparse.'''
+        with pytest.raises(SystemExit) as exc:
+            _run(monkeypatch, '--id', 'x', '-h')
+        assert exc.value.code == 0
+        parser_help = capsys.readouterr().out
+
+        _run(monkeypatch, *args)
+        assert capsys.readouterr().out == parser_help
+
+    def test_fallback_help_without_matching_layout(self, monkeypatch, capsys):
+        '''Test other Python versions print help via argparse.'''
+        monkeypatch.setattr(cli, '_HELP', {'cipdb': 'stale'})
+        monkeypatch.setattr(cli, '_HELP_IS_CURRENT', False)
+        _run(monkeypatch, '-h')
+        assert capsys.readouterr().out == cli._build_parser().format_help()
+
+    def test_bare_invocation_exits_cleanly(self, monkeypatch, capsys):
+        '''Test running without arguments prints usage and returns.'''
+        _run(monkeypatch)
+        assert capsys.readouterr().out.startswith('usage: cipdb [-h]')
+
+    @pytest.mark.parametrize('argv0, prog', [
+        ('/usr/bin/cipdb', 'cipdb'),
+        ('/site-packages/cipdb/__main__.py', 'python -m cipdb'),
+        ('cipdb-dev', 'cipdb-dev'),
+    ])
+    def test_prog_follows_invocation(self, monkeypatch, capsys, argv0, prog):
+        '''Test help and errors name the program as it was invoked.'''
+        monkeypatch.setattr(sys, 'argv', [argv0, '-h'])
+        cli.main()
+        assert capsys.readouterr().out.startswith(f'usage: {prog} [-h]')
+
+        monkeypatch.setattr(sys, 'argv', [argv0, '--bogus'])
+        with pytest.raises(SystemExit):
+            cli.main()
+        assert capsys.readouterr().err.startswith(f'usage: {prog} [-h]')
+
+
+class TestStatus:
+    '''Test the --status command.'''
+
+    @patch('cipdb.__main__._build_parser', side_effect=AssertionError)
+    def test_lone_status_skips_argparse(self, mock_build, monkeypatch, capsys):
+        '''Test a lone --status never builds the parser.'''
+        _run(monkeypatch, '--status')
+        assert 'cipdb Status' in capsys.readouterr().out
+        assert not mock_build.called
+
+    def test_status_with_env(self, monkeypatch, capsys):
+        '''Test --status combined with --env sets the variable first.'''
+        _unset(monkeypatch, 'DEBUG')
+        _run(monkeypatch, '--status', '--env', 'DEBUG=yes')
+        assert 'DEBUG: yes' in capsys.readouterr().out
+
+
+class TestRunScript:
+    '''Test running a target script.'''
+
+    def test_missing_script_exits_1(self, monkeypatch, capsys, tmp_path):
+        '''Test a missing script is reported with exit code 1.'''
+        missing = str(tmp_path / 'missing.py')
+        with pytest.raises(SystemExit) as exc:
+            _run(monkeypatch, missing)
+        assert exc.value.code == 1
+        assert f"Script '{missing}' not found" in capsys.readouterr().err
+
+    def test_script_file_not_found_propagates(self, monkeypatch, tmp_path):
+        '''Test a FileNotFoundError raised by the script is not swallowed.'''
+        script = tmp_path / 'script.py'
+        script.write_text("open('/nonexistent/cipdb-test')\n")
+        with pytest.raises(FileNotFoundError, match='cipdb-test'):
+            _run(monkeypatch, str(script))
+
+    def test_script_runs_as_main(self, monkeypatch, capsys, tmp_path):
+        '''Test the script sees __main__, its path and its arguments.'''
+        script = tmp_path / 'script.py'
+        script.write_text(
+            "import sys\n"
+            "print(__name__, __file__ == sys.argv[0], sys.argv[1:])\n"
+        )
+        _unset(monkeypatch, 'CIPDB_ID')
+        _run(monkeypatch, '--id', 'v', str(script), 'a', '--flag')
+        assert capsys.readouterr().out == "__main__ True ['a', '--flag']\n"
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -2,10 +2,12 @@
 '''Test suite for cipdb package.'''
 
 import os
+import subprocess
 import sys
 import pytest
 from unittest.mock import patch, MagicMock
 import cipdb
+from cipdb._core import _ConditionChecker
 
 
 class TestCipdbCore:
@@ -161,6 +163,76 @@ class TestCipdbCore:
             assert not mock_pm.called
 
 
+class TestConditionCheckerCache:
+    '''Test env caching stays consistent with concurrent invalidation.'''
+
+    def test_stale_env_value_not_stored(self):
+        '''Test a value read before an invalidation is not cached.'''
+        checker = _ConditionChecker()
+
+        class RacingEnviron:
+            def __getitem__(self, key):
+                checker.invalidate_env()  # env changed right after the read
+                return 'old'
+
+        with patch('cipdb._core.os.environ', RacingEnviron()):
+            assert checker._get_env('CIPDB_TEST_VAR') == 'old'
+        assert 'CIPDB_TEST_VAR' not in checker._env_cache
+
+    @patch('ipdb.set_trace')
+    @pytest.mark.skipif(not os.supports_bytes_environ, reason='no os.environb')
+    def test_environb_writes_invalidate(self, mock_ipdb):
+        '''Test os.environb writes are seen like os.environ writes.'''
+        try:
+            os.environb[b'CIPDB'] = b'false'
+            cipdb.set_trace(True)
+            assert not mock_ipdb.called
+        finally:
+            os.environ.pop('CIPDB', None)
+        cipdb.set_trace(True)
+        assert mock_ipdb.called
+
+    @patch('ipdb.set_trace')
+    def test_refresh_env(self, mock_ipdb):
+        '''Test refresh_env picks up changes made behind os.environ.'''
+        cipdb.set_trace(True)
+        assert mock_ipdb.called
+        mock_ipdb.reset_mock()
+        try:
+            # Write the backing store directly, as os.putenv-style changes do
+            os.environ._data[os.environ.encodekey('CIPDB')] = b'false'
+            cipdb.refresh_env()
+            cipdb.set_trace(True)
+            assert not mock_ipdb.called
+        finally:
+            os.environ.pop('CIPDB', None)
+
+    def test_reload_does_not_stack_tracking(self):
+        '''Test reloading _core replaces rather than stacks the env subclass.'''
+        code = (
+            "import importlib, os, cipdb._core as c\n"
+            "importlib.reload(c)\n"
+            "assert type(os.environ) is c._TrackedEnviron\n"
+            "assert type(os.environ).__bases__ == (os._Environ,)\n"
+            "assert type(os.environb) is c._TrackedEnviron\n"
+        )
+        subprocess.run([sys.executable, '-c', code], check=True)
+
+    def test_stale_check_not_installed(self):
+        '''Test a check built before an invalidation is not installed.'''
+        checker = _ConditionChecker()
+        build = _ConditionChecker._build_check
+
+        def racing_build(self):
+            check = build(self)
+            self.invalidate_env()  # settings changed while building
+            return check
+
+        with patch.object(_ConditionChecker, '_build_check', racing_build):
+            assert checker.check(True)
+        assert checker.check == checker._rebuild_check
+
+
 class TestCipdbFallback:
     '''Test fallback behavior.'''
     
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+'''Test suite for the optional compiled check().'''
+
+import pytest
+from cipdb._core import _ConditionChecker
+
+_core_fast = pytest.importorskip('cipdb._core_fast')
+
+
+class TestMakeCheck:
+    '''Test the compiled check matches the pure-Python semantics.'''
+
+    def setup_method(self):
+        '''Create a checker to dispatch string/callable conditions.'''
+        self.checker = _ConditionChecker()
+
+    def _make(self, disabled=False, active=None):
+        return _core_fast.make_check(
+            disabled,
+            active,
+            _ConditionChecker._DISPATCH,
+            self.checker,
+            self.checker._eval_other,
+        )
+
+    def test_disabled(self):
+        '''Test a disabled check never triggers.'''
+        check = self._make(disabled=True)
+        assert check(True) is False
+        assert check(True, id='any') is False
+
+    def test_boolean_conditions(self):
+        '''Test literal True/False.'''
+        check = self._make()
+        assert check() is True
+        assert check(True) is True
+        assert check(False) is False
+
+    def test_active_ids(self):
+        '''Test ID matching against the bound active set.'''
+        check = self._make(active=frozenset({'validate', 'save'}))
+        assert check(id='save') is True
+        assert check(id='other') is False
+        assert check(False, id='save') is False
+        assert check(True) is True
+
+    def test_callable_condition(self):
+        '''Test callables go through the checker fallback.'''
+        check = self._make()
+        assert check(lambda: True) is True
+        assert check(lambda: 1 / 0) is False
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+'''Test suite for cipdb AST optimizer.'''
+
+import ast
+import sys
+import pytest
+from unittest.mock import patch
+import cipdb
+from cipdb._optimizer import _OptimizingFinder, _SetTraceFalseEliminator
+
+
+def _eliminate(source):
+    '''Return the eliminated AST of source, dumped for comparison.'''
+    tree = _SetTraceFalseEliminator().visit(ast.parse(source))
+    return ast.dump(tree)
+
+
+def _dump(source):
+    return ast.dump(ast.parse(source))
+
+
+class TestSetTraceFalseEliminator:
+    '''Test AST rewriting of disabled breakpoints.'''
+
+    def test_removes_positional_false(self):
+        '''Test cipdb.set_trace(False) is removed.'''
+        assert _eliminate("x = 1\ncipdb.set_trace(False)\ny = 2") == _dump("x = 1\ny = 2")
+
+    def test_removes_keyword_false(self):
+        '''Test cipdb.set_trace(condition=False, id=...) is removed.'''
+        assert _eliminate("cipdb.set_trace(condition=False, id='a')\nx = 1") == _dump("x = 1")
+
+    def test_keeps_other_calls(self):
+        '''Test enabled or non-constant breakpoints are kept.'''
+        for source in [
+            "cipdb.set_trace()",
+            "cipdb.set_trace(True)",
+            "cipdb.set_trace(flag)",
+            "cipdb.set_trace(False, id=make_id())",
+            "pdb.set_trace(False)",
+        ]:
+            assert _eliminate(source) == _dump(source)
+
+    def test_empty_block_gets_pass(self):
+        '''Test blocks emptied by elision stay valid.'''
+        source = "for i in range(3):\n    cipdb.set_trace(False)"
+        tree = _SetTraceFalseEliminator().visit(ast.parse(source))
+        assert ast.dump(tree) == _dump("for i in range(3):\n    pass")
+        compile(tree, "<test>", "exec")
+
+    @pytest.mark.parametrize('source', [
+        "cipdb.set_trace(False)",
+        pytest.param(
+            "match x:\n    case 1:\n        cipdb.set_trace(False)",
+            marks=pytest.mark.skipif(
+                sys.version_info < (3, 10), reason='match needs Python 3.10+'
+            ),
+        ),
+        "try:\n    x = 1\nfinally:\n    cipdb.set_trace(False)",
+        "key = lambda x: x\ncipdb.set_trace(False)",
+        "y = a if b else c\ncipdb.set_trace(False)",
+    ])
+    def test_emptied_blocks_compile(self, source):
+        '''Test elision keeps modules compilable (locations, expression bodies).'''
+        tree = _SetTraceFalseEliminator().visit(ast.parse(source))
+        compile(tree, "<test>", "exec")
+
+
+class TestOptimizingFinder:
+    '''Test the import hook end to end.'''
+
+    def teardown_method(self):
+        '''Remove the finder and the test module.'''
+        while _OptimizingFinder in sys.meta_path:
+            sys.meta_path.remove(_OptimizingFinder)
+        sys.modules.pop('cipdb_optimizer_target', None)
+
+    @patch('cipdb.set_trace')
+    def test_import_elides_calls(self, mock_set_trace, tmp_path, monkeypatch):
+        '''Test imported modules never call set_trace(False).'''
+        (tmp_path / 'cipdb_optimizer_target.py').write_text(
+            "import cipdb\n"
+            "def loop():\n"
+            "    for i in range(3):\n"
+            "        cipdb.set_trace(False)\n"
+            "    return i\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        cipdb.install_ast_optimizer()
+        cipdb.install_ast_optimizer()
+        assert sys.meta_path.count(_OptimizingFinder) == 1
+
+        import cipdb_optimizer_target
+
+        assert cipdb_optimizer_target.loop() == 2
+        assert not mock_set_trace.called
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])